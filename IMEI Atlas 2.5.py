@@ -19,16 +19,24 @@ from __future__ import annotations
 import argparse
 import os
 import random
+import re
 import secrets
 import csv
+import functools
 import json
 import sqlite3
 import shutil
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from enum import Enum
+from itertools import islice, repeat
+
+try:  # optional: faster JSON export
+    import orjson
+except ImportError:
+    orjson = None
 
 # -------------------------
 # Config & constants
@@ -40,6 +48,7 @@ USE_COLOR_BY_DEFAULT: bool = True
 AT_OUTPUT_DIRECTORY: str = r"./exports"
 DB_OUTPUT_DIRECTORY: str = r"./database"
 MAX_IMEI_GENERATION: int = 1000  # Safety limit
+FILE_TIMESTAMP_FORMAT: str = "%Y%m%dT%H%M%SZ"  # UTC stamp in export/backup file names
 
 DISCLAIMER = (
     "WARNING: This tool is for educational and testing purposes only. "
@@ -59,6 +68,8 @@ class DeviceType(Enum):
     IOT = "IoT Device"
     OTHER = "Other"
 
+_DEVICETYPE_BY_NAME: Dict[str, DeviceType] = {t.name: t for t in DeviceType}
+
 # Example devices (mix of single and multi-tac examples)
 DEVICE_DATABASE: List[Dict[str, Any]] = [
     {"tac": ["35006781","35010872","35052389","35091250","35110451","35461444","35500828"], "name": "iPhone", "model": "6 Pro Max", "type": DeviceType.SMARTPHONE},
@@ -104,6 +115,27 @@ DEVICE_DATABASE: List[Dict[str, Any]] = [
     {"tac": "35986104", "name": "asuse", "model": "gane", "type": DeviceType.ROUTER},
 ]
 
+def _prepare_device(device: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize a DEVICE_DATABASE entry into the display fields of a device group (no IMEIs)."""
+    tacs_raw = device.get("tac", [])
+    if isinstance(tacs_raw, str):
+        # allow '|' separated string as legacy
+        tacs_list = [t.strip() for t in tacs_raw.split("|") if t.strip()]
+    elif isinstance(tacs_raw, (list, tuple)):
+        tacs_list = list(tacs_raw)
+    else:
+        tacs_list = []
+    device_name = f"{device.get('name','Unknown')} {device.get('model','')}".strip()
+    return {
+        "tacs": tacs_list,
+        "name": device_name,
+        "type": device.get("type").value if isinstance(device.get("type"), DeviceType) else str(device.get("type", "Unknown")),
+        "_search": device_name.lower()  # lowercased once for the search filter
+    }
+
+# normalized once at import; main() only has to fill in the IMEIs
+_PREPARED_DEVICES: List[Dict[str, Any]] = [_prepare_device(d) for d in DEVICE_DATABASE]
+
 # -------------------------
 # Terminal color helpers
 # -------------------------
@@ -121,12 +153,35 @@ class Colors:
 def apply_color(text: str, code: str, enabled: bool) -> str:
     return text if not enabled else f"{code}{text}{Colors.RESET}"
 
+_RESET = Colors.RESET
+
+def _color_on(text: str, code: str) -> str:
+    return f"{code}{text}{_RESET}"
+
+def _color_off(text: str, code: str) -> str:
+    return text
+
+def make_color_fn(enabled: bool) -> Callable[[str, str], str]:
+    """apply_color with `enabled` bound once, so render loops don't re-test it per call."""
+    return _color_on if enabled else _color_off
+
 # -------------------------
 # Luhn algorithm utilities
 # -------------------------
+# ASCII digit -> Luhn contribution, for plain and doubled positions
+_LUHN_PLAIN_TABLE = bytes.maketrans(b"0123456789", bytes(range(10)))
+_LUHN_DOUBLE_TABLE = bytes.maketrans(b"0123456789", bytes((0, 2, 4, 6, 8, 1, 3, 5, 7, 9)))
+
 def luhn_checksum_mod10(number_string: str) -> int:
     if not number_string.isdigit():
         raise ValueError("Luhn input contains non-digit characters")
+    if number_string.isascii():
+        ascii_digits = number_string.encode("ascii")
+        # from the right: even offsets are plain, odd ones doubled; each
+        # parity slice is mapped through its table and summed, no per-digit branch
+        return (sum(ascii_digits[-1::-2].translate(_LUHN_PLAIN_TABLE))
+                + sum(ascii_digits[-2::-2].translate(_LUHN_DOUBLE_TABLE))) % 10
+    # other Unicode digits keep the original arithmetic
     total = 0
     for position_from_right, ch in enumerate(reversed(number_string)):
         digit = ord(ch) - ord("0")
@@ -142,12 +197,74 @@ def luhn_checksum_mod10(number_string: str) -> int:
 def calculate_imei_check_digit(first_14_digits: str) -> str:
     if not (isinstance(first_14_digits, str) and first_14_digits.isdigit() and len(first_14_digits) == 14):
         raise ValueError("first_14_digits must be a 14-digit numeric string")
+    if first_14_digits.isascii():
+        # with the check digit appended, forward index 1, 3, ..., 13 are the
+        # doubled positions; sum both parity slices directly, no padding or reversal
+        ascii_digits = first_14_digits.encode("ascii")
+        total = sum(ascii_digits[0::2].translate(_LUHN_PLAIN_TABLE)) + sum(ascii_digits[1::2].translate(_LUHN_DOUBLE_TABLE))
+        return _CHECK_DIGITS[total % 10]
     mod = luhn_checksum_mod10(first_14_digits + "0")
     return str((10 - mod) % 10)
 
 def validate_imei(imei_string: str) -> bool:
     return isinstance(imei_string, str) and len(imei_string) == 15 and imei_string.isdigit() and luhn_checksum_mod10(imei_string) == 0
 
+# byte value -> value mod 10, applied to the per-IMEI sums in the batch checksum
+_MOD10_TABLE = bytes(i % 10 for i in range(256))
+
+def luhn_checksum_mod10_batch(imeis: List[str]) -> List[Optional[int]]:
+    """
+    Luhn checksum of many IMEIs in one pass (None where an entry is not 15 ASCII digits).
+    Column i of every IMEI is sliced out of one joined buffer, mapped to its Luhn
+    contribution and read as a base-256 integer; adding the 15 columns sums every
+    IMEI in its own byte (at most 15 * 9, so no carries).
+    """
+    ok = [isinstance(i, str) and len(i) == 15 and i.isascii() and i.isdigit() for i in imeis]
+    blob = "".join(i for i, good in zip(imeis, ok) if good).encode("ascii")
+    rows = len(blob) // 15
+    total = 0
+    for col in range(15):
+        table = _LUHN_DOUBLE_TABLE if col % 2 else _LUHN_PLAIN_TABLE
+        total += int.from_bytes(blob[col::15].translate(table), "big")
+    mods = iter(total.to_bytes(rows, "big").translate(_MOD10_TABLE))
+    return [next(mods) if good else None for good in ok]
+
+# Luhn contribution of a 6-digit serial split into 3-digit halves (IMEI positions 8-10 and 11-13)
+_LUHN_DOUBLED = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+_SERIAL_HI_LUHN = tuple(a + _LUHN_DOUBLED[b] + c for a in range(10) for b in range(10) for c in range(10))
+_SERIAL_LO_LUHN = tuple(_LUHN_DOUBLED[a] + b + _LUHN_DOUBLED[c] for a in range(10) for b in range(10) for c in range(10))
+_CHECK_DIGITS = "0987654321"  # indexed by the Luhn sum of the first 14 digits, mod 10
+_DIGITS3 = tuple(f"{i:03d}" for i in range(1000))
+_SERIAL_LIMIT = 10**6
+
+def _is_tac(value: object) -> bool:
+    """True for exactly 8 ASCII digits (str.isdigit alone also admits other Unicode digits)."""
+    return isinstance(value, str) and len(value) == 8 and value.isascii() and value.isdigit()
+
+_TAC_LIST_RE = re.compile(r"[0-9]{8}(?:\|[0-9]{8})*")
+
+def _split_tacs(text: str) -> Tuple[List[str], List[str]]:
+    """Split '|'-separated TAC input into (tacs, invalid entries)."""
+    if _TAC_LIST_RE.fullmatch(text):
+        # well-formed input is settled by one regex match, no per-entry checks
+        return text.split("|"), []
+    tacs = [t.strip() for t in text.split("|") if t.strip()]
+    return tacs, [t for t in tacs if not _is_tac(t)]
+
+# bounded: random-TAC batches feed it a fresh TAC per IMEI
+@functools.lru_cache(maxsize=256)
+def _tac_luhn_partial(tac_8_digits: str) -> int:
+    """Luhn contribution of the TAC digits (IMEI positions 0-7), computed once per TAC."""
+    total = 0
+    for position, ch in enumerate(tac_8_digits):
+        digit = ord(ch) - ord("0")
+        if position % 2 == 1:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return total
+
 # -------------------------
 # IMEI Generator
 # -------------------------
@@ -159,12 +276,24 @@ class IMEIGenerator:
         return f"{self.rng.randrange(0, 10**6):06d}"
 
     def generate_imei_from_tac(self, tac_8_digits: str) -> str:
-        if not (isinstance(tac_8_digits, str) and tac_8_digits.isdigit() and len(tac_8_digits) == 8):
+        if not _is_tac(tac_8_digits):
             raise ValueError("TAC must be exactly 8 digits")
-        serial6 = self.generate_six_digit_serial()
-        first14 = tac_8_digits + serial6
-        check_digit = calculate_imei_check_digit(first14)
-        return first14 + check_digit
+        return self._imeis_for_tac(tac_8_digits, 1)[0]
+
+    def _draw_serials(self, count: int) -> List[int]:
+        # randrange(0, 10**6) draws getrandbits(20) until the value is below the
+        # limit; doing that as one filtered stream consumes the generator
+        # exactly like count separate randrange calls, without the per-call overhead
+        return list(islice(filter(_SERIAL_LIMIT.__gt__, map(self.rng.getrandbits, repeat(20))), count))
+
+    def _imeis_for_tac(self, tac_8_digits: str, count: int) -> List[str]:
+        # check digit from the cached TAC sum plus two table lookups on the
+        # integer serial; no per-digit loop or string round trip
+        partial = _tac_luhn_partial(tac_8_digits)
+        return [
+            f"{tac_8_digits}{_DIGITS3[hi]}{_DIGITS3[lo]}{_CHECK_DIGITS[(partial + _SERIAL_HI_LUHN[hi] + _SERIAL_LO_LUHN[lo]) % 10]}"
+            for hi, lo in map(divmod, self._draw_serials(count), repeat(1000))
+        ]
 
     def generate_random_8digit_tac(self) -> str:
         return f"{self.rng.randrange(10**7, 10**8):08d}"
@@ -179,14 +308,16 @@ class IMEIGenerator:
         if isinstance(tac, list):
             out: Dict[str, List[str]] = {}
             for t in tac:
-                if not (isinstance(t, str) and t.isdigit() and len(t) == 8):
+                if not _is_tac(t):
                     raise ValueError(f"Invalid TAC in list: {t}")
-                out[t] = [self.generate_imei_from_tac(t) for _ in range(count)]
+                out[t] = self._imeis_for_tac(t, count)
             return out
         else:
             if tac == "Various":
                 return [self.generate_completely_random_imei() for _ in range(count)]
-            return [self.generate_imei_from_tac(tac) for _ in range(count)]
+            if not _is_tac(tac):
+                raise ValueError("TAC must be exactly 8 digits")
+            return self._imeis_for_tac(tac, count)
     
     def generate_imei_from_partial_tac(self, partial_tac: str) -> str:
         """Generate IMEI from partial TAC (1-8 digits) by randomly completing it to 8 digits"""
@@ -203,38 +334,229 @@ class IMEIGenerator:
 # -------------------------
 # AT-command formatting
 # -------------------------
+# fixed text around the IMEI (MikroTik: default interface only)
+_MIKROTIK_AT_PREFIX = f'interface lte at-chat {DEFAULT_LTE_INTERFACE} input="AT+EGMR=1,7,\\"'
+_MIKROTIK_AT_SUFFIX = '\\""'
+_FIBERHOME_AT_PREFIX = 'AT+EGMR=1,7,"'
+
 def mikrotik_at_command_for_imei(imei: str, interface: str = DEFAULT_LTE_INTERFACE) -> str:
+    if interface == DEFAULT_LTE_INTERFACE:
+        return _MIKROTIK_AT_PREFIX + imei + _MIKROTIK_AT_SUFFIX
     return f'interface lte at-chat {interface} input="AT+EGMR=1,7,\\\"{imei}\\\""'
 
 def fiberhome_at_command_for_imei(imei: str) -> str:
-    return f'AT+EGMR=1,7,\"{imei}\"'
+    return _FIBERHOME_AT_PREFIX + imei + '"'
+
+def mikrotik_at_commands_by_tac(imeis_map: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """MikroTik AT command for every IMEI of a device, keyed like its imeis map."""
+    # bulk path: one comprehension per TAC instead of a function call per IMEI
+    prefix, suffix = _MIKROTIK_AT_PREFIX, _MIKROTIK_AT_SUFFIX
+    return {tac_val: [prefix + imei + suffix for imei in imeis] for tac_val, imeis in imeis_map.items()}
 
 # -------------------------
 # File utilities & exports (multi-TAC aware)
 # -------------------------
+def _utc_now() -> datetime:
+    """Current UTC time as a naive datetime (what utcnow() returned, without the deprecated call)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+_SAFE_FILENAME_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._- ")
+
+class _SafeFilenameTable(dict):
+    """str.translate table: allowed characters map to themselves, anything else to '_'."""
+    def __missing__(self, codepoint: int) -> str:
+        # only reached for code points above U+00FF, which are never allowed
+        return "_"
+
+_SAFE_FILENAME_TABLE = _SafeFilenameTable(
+    (i, chr(i) if chr(i) in _SAFE_FILENAME_CHARS else "_") for i in range(256))
+
 def make_safe_filename(desired_name: str) -> str:
-    allowed_chars = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._- ")
-    return "".join((c if c in allowed_chars else "_") for c in desired_name).strip()
+    return desired_name.translate(_SAFE_FILENAME_TABLE).strip()
+
+def _at_command_lines(imeis: List[str], mikrotik: bool, fiberhome: bool,
+                      interface: str = DEFAULT_LTE_INTERFACE) -> List[str]:
+    """Newline-terminated AT command lines for imeis, MikroTik before FiberHome per IMEI."""
+    if mikrotik and fiberhome:
+        return [f"{mikrotik_at_command_for_imei(imei, interface)}\n{fiberhome_at_command_for_imei(imei)}\n"
+                for imei in imeis]
+    if mikrotik:
+        return [mikrotik_at_command_for_imei(imei, interface) + "\n" for imei in imeis]
+    if fiberhome:
+        return [fiberhome_at_command_for_imei(imei) + "\n" for imei in imeis]
+    return []
 
 def save_at_commands_to_file(device_name: str, tac: str, imei_list: List[str],
                              output_dir: str = AT_OUTPUT_DIRECTORY,
                              include_both: Union[bool,str] = True,
-                             interface: str = DEFAULT_LTE_INTERFACE) -> str:
+                             interface: str = DEFAULT_LTE_INTERFACE,
+                             generated_at: Optional[str] = None) -> str:
+    # callers saving several TACs in one go pass one shared generated_at
+    if generated_at is None:
+        generated_at = _utc_now().isoformat() + "Z"
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     safe_name = make_safe_filename(device_name) or "device"
     file_path = Path(output_dir) / f"at_{safe_name}_{tac}.txt"
+    parts = [f"# AT commands for {device_name} (TAC {tac})\n",
+             f"# Generated: {generated_at}\n",
+             f"# {DISCLAIMER}\n\n"]
+    parts.extend(_at_command_lines(imei_list,
+                                   include_both in (True, "mikrotik", "both"),
+                                   include_both in (True, "fiberhome", "both"),
+                                   interface))
+    parts.append("\n# End of AT commands\n")
     with file_path.open("w", encoding="utf-8") as fh:
-        fh.write(f"# AT commands for {device_name} (TAC {tac})\n")
-        fh.write(f"# Generated: {datetime.utcnow().isoformat()}Z\n")
-        fh.write(f"# {DISCLAIMER}\n\n")
-        for imei in imei_list:
-            if include_both in (True, "mikrotik", "both"):
-                fh.write(mikrotik_at_command_for_imei(imei, interface) + "\n")
-            if include_both in (True, "fiberhome", "both"):
-                fh.write(fiberhome_at_command_for_imei(imei) + "\n")
-        fh.write("\n# End of AT commands\n")
+        fh.write("".join(parts))
     return str(file_path.resolve())
 
+def _json_dumps_indented(obj: Any) -> str:
+    """Same text as json.dumps(obj, indent=2, ensure_ascii=False); uses orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+def _text_to_file_bytes(text: str) -> bytes:
+    """UTF-8 bytes of text with newlines translated the way a text-mode file would."""
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text.encode("utf-8")
+
+def _export_txt(output_path: Path, device_groups: List[Dict[str, object]], generated_at: str,
+                include_timestamps: bool, include_at_commands: bool) -> None:
+    """Plain-text export grouped by device and TAC."""
+    # each device is assembled into one string, encoded once and written as bytes
+    with output_path.open("wb", buffering=1 << 20) as fh:
+        header = ["# IMEI Atlas - All devices export\n"]
+        if include_timestamps:
+            header.append(f"# Generated: {generated_at}\n")
+        header.append(f"# Devices: {len(device_groups)}\n")
+        header.append(f"# {DISCLAIMER}\n\n")
+        fh.write(_text_to_file_bytes("".join(header)))
+        for group in device_groups:
+            device_name = group.get("name", "Unknown Device")
+            tacs = group.get("tacs", [])
+            imeis_map: Dict[str, List[str]] = group.get("imeis", {})
+            at_map = mikrotik_at_commands_by_tac(imeis_map) if include_at_commands else {}
+            chunks = [f"Device: {device_name}\n", "-" * 60 + "\n"]
+            for tac_val in tacs:
+                chunks.append(f"TAC: {tac_val}\n")
+                if include_at_commands:
+                    chunks.extend(f"{imei_val}    {at_cmd}\n"
+                                  for imei_val, at_cmd in zip(imeis_map.get(tac_val, []), at_map.get(tac_val, [])))
+                else:
+                    chunks.extend(f"{imei_val}\n" for imei_val in imeis_map.get(tac_val, []))
+                chunks.append("\n")
+            fh.write(_text_to_file_bytes("".join(chunks)))
+
+def _export_csv(output_path: Path, device_groups: List[Dict[str, object]], generated_at: str,
+                include_timestamps: bool, include_at_commands: bool) -> None:
+    """One CSV row per IMEI."""
+    with output_path.open("w", newline='', encoding="utf-8", buffering=1 << 20) as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["Device Name", "TAC", "IMEI", "AT Command" if include_at_commands else ""])
+        for group in device_groups:
+            device_name = group.get("name", "Unknown Device")
+            imeis_map: Dict[str, List[str]] = group.get("imeis", {})
+            # one writerows() per device keeps the row loop inside the csv module
+            if include_at_commands:
+                at_map = mikrotik_at_commands_by_tac(imeis_map)
+                writer.writerows((device_name, tac_val, imei_val, at_cmd)
+                                 for tac_val, imeis in imeis_map.items()
+                                 for imei_val, at_cmd in zip(imeis, at_map[tac_val]))
+            else:
+                writer.writerows((device_name, tac_val, imei_val)
+                                 for tac_val, imeis in imeis_map.items()
+                                 for imei_val in imeis)
+
+def _export_json(output_path: Path, device_groups: List[Dict[str, object]], generated_at: str,
+                 include_timestamps: bool, include_at_commands: bool) -> None:
+    """JSON document with metadata and one object per device."""
+    # stream one device object at a time instead of building the whole
+    # document in memory; the framing matches json.dump(..., indent=2)
+    metadata = {
+        "generated": generated_at,
+        "device_count": len(device_groups),
+        "disclaimer": DISCLAIMER
+    }
+    with output_path.open("w", encoding="utf-8") as fh:
+        fh.write('{\n  "metadata": ')
+        fh.write(_json_dumps_indented(metadata).replace("\n", "\n  "))
+        fh.write(',\n  "devices": [')
+        sep = "\n    "
+        for group in device_groups:
+            device_obj = {
+                "name": group.get("name", "Unknown Device"),
+                "tacs": group.get("tacs", []),
+                "imeis": group.get("imeis", {})
+            }
+            if include_at_commands:
+                # include sample at_commands per imei if requested
+                device_obj["at_commands"] = mikrotik_at_commands_by_tac(device_obj["imeis"])
+            fh.write(sep)
+            fh.write(_json_dumps_indented(device_obj).replace("\n", "\n    "))
+            sep = ",\n    "
+        fh.write("]\n}" if sep == "\n    " else "\n  ]\n}")
+
+def _export_sqlite(output_path: Path, device_groups: List[Dict[str, object]], generated_at: str,
+                   include_timestamps: bool, include_at_commands: bool) -> None:
+    """SQLite database with devices and imeis tables."""
+    conn = sqlite3.connect(output_path)
+    # the file is handed to the user, so keep the default rollback journal (a
+    # WAL database needs -wal/-shm side files and write access to open);
+    # the bulk write only relaxes fsync and keeps temp structures in memory
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    cur = conn.cursor()
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS devices (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS imeis (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            device_id INTEGER,
+            tac TEXT,
+            imei TEXT NOT NULL UNIQUE,
+            at_command TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (device_id) REFERENCES devices (id)
+        )
+    ''')
+    conn.commit()
+    # all rows go in as a single transaction; duplicates are skipped by OR IGNORE
+    cur.execute("BEGIN")
+    for group in device_groups:
+        device_name = group.get("name", "Unknown Device")
+        cur.execute("INSERT INTO devices (name) VALUES (?)", (device_name,))
+        device_id = cur.lastrowid
+        imeis_map: Dict[str, List[str]] = group.get("imeis", {})
+        # rows are generated lazily; executemany binds them as it consumes the generator
+        if include_at_commands:
+            at_map = mikrotik_at_commands_by_tac(imeis_map)
+            rows = (
+                (device_id, tac_val, imei_val, at_cmd)
+                for tac_val, imeis in imeis_map.items()
+                for imei_val, at_cmd in zip(imeis, at_map[tac_val])
+            )
+        else:
+            rows = ((device_id, tac_val, imei_val, None) for tac_val, imeis in imeis_map.items() for imei_val in imeis)
+        cur.executemany("INSERT OR IGNORE INTO imeis (device_id, tac, imei, at_command) VALUES (?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+# format_type -> exporter; every exporter takes the same arguments and gets
+# the export's single timestamp as a preformatted ISO string
+_EXPORTERS = {
+    "txt": _export_txt,
+    "csv": _export_csv,
+    "json": _export_json,
+    "sqlite": _export_sqlite,
+}
+
 def save_all_devices_imeis_to_file(
     device_groups: List[Dict[str, object]],
     output_dir: str = AT_OUTPUT_DIRECTORY,
@@ -244,136 +566,45 @@ def save_all_devices_imeis_to_file(
     format_type: str = "txt"
 ) -> str:
     Path(output_dir).mkdir(parents=True, exist_ok=True)
+    now = _utc_now()  # one timestamp for the file name and the file contents
     if filename:
         safe_filename = make_safe_filename(filename)
         if not safe_filename.endswith(f".{format_type}"):
             safe_filename = f"{safe_filename}.{format_type}"
     else:
-        safe_filename = f"all_imeis_{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.{format_type}"
+        safe_filename = f"all_imeis_{now.strftime(FILE_TIMESTAMP_FORMAT)}.{format_type}"
     output_path = Path(output_dir) / safe_filename
 
-    if format_type == "txt":
-        with output_path.open("w", encoding="utf-8") as fh:
-            fh.write("# IMEI Atlas - All devices export\n")
-            if include_timestamps:
-                fh.write(f"# Generated: {datetime.utcnow().isoformat()}Z\n")
-            fh.write(f"# Devices: {len(device_groups)}\n")
-            fh.write(f"# {DISCLAIMER}\n\n")
-            for group in device_groups:
-                device_name = group.get("name", "Unknown Device")
-                tacs = group.get("tacs", [])
-                imeis_map: Dict[str, List[str]] = group.get("imeis", {})
-                fh.write(f"Device: {device_name}\n")
-                fh.write("-" * 60 + "\n")
-                for tac_val in tacs:
-                    fh.write(f"TAC: {tac_val}\n")
-                    for imei_val in imeis_map.get(tac_val, []):
-                        if include_at_commands:
-                            at_cmd = mikrotik_at_command_for_imei(imei_val)
-                            fh.write(f"{imei_val}    {at_cmd}\n")
-                        else:
-                            fh.write(f"{imei_val}\n")
-                    fh.write("\n")
-    elif format_type == "csv":
-        with output_path.open("w", newline='', encoding="utf-8") as fh:
-            writer = csv.writer(fh)
-            writer.writerow(["Device Name", "TAC", "IMEI", "AT Command" if include_at_commands else ""])
-            for group in device_groups:
-                device_name = group.get("name", "Unknown Device")
-                imeis_map: Dict[str, List[str]] = group.get("imeis", {})
-                for tac_val, imeis in imeis_map.items():
-                    for imei_val in imeis:
-                        if include_at_commands:
-                            writer.writerow([device_name, tac_val, imei_val, mikrotik_at_command_for_imei(imei_val)])
-                        else:
-                            writer.writerow([device_name, tac_val, imei_val])
-    elif format_type == "json":
-        data = {
-            "metadata": {
-                "generated": datetime.utcnow().isoformat() + "Z",
-                "device_count": len(device_groups),
-                "disclaimer": DISCLAIMER
-            },
-            "devices": []
-        }
-        for group in device_groups:
-            device_obj = {
-                "name": group.get("name", "Unknown Device"),
-                "tacs": group.get("tacs", []),
-                "imeis": group.get("imeis", {})
-            }
-            if include_at_commands:
-                # include sample at_commands per imei if requested
-                at_map = {}
-                for tac_val, imeis in device_obj["imeis"].items():
-                    at_map[tac_val] = [mikrotik_at_command_for_imei(i) for i in imeis]
-                device_obj["at_commands"] = at_map
-            data["devices"].append(device_obj)
-        with output_path.open("w", encoding="utf-8") as fh:
-            json.dump(data, fh, indent=2, ensure_ascii=False)
-    elif format_type == "sqlite":
-        Path(DB_OUTPUT_DIRECTORY).mkdir(parents=True, exist_ok=True)
-        conn = sqlite3.connect(output_path)
-        cur = conn.cursor()
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS devices (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS imeis (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                device_id INTEGER,
-                tac TEXT,
-                imei TEXT NOT NULL UNIQUE,
-                at_command TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (device_id) REFERENCES devices (id)
-            )
-        ''')
-        conn.commit()
-        for group in device_groups:
-            device_name = group.get("name", "Unknown Device")
-            cur.execute("INSERT INTO devices (name) VALUES (?)", (device_name,))
-            device_id = cur.lastrowid
-            imeis_map: Dict[str, List[str]] = group.get("imeis", {})
-            for tac_val, imeis in imeis_map.items():
-                for imei_val in imeis:
-                    at_cmd = mikrotik_at_command_for_imei(imei_val) if include_at_commands else None
-                    try:
-                        cur.execute("INSERT OR IGNORE INTO imeis (device_id, tac, imei, at_command) VALUES (?, ?, ?, ?)",
-                                    (device_id, tac_val, imei_val, at_cmd))
-                    except sqlite3.IntegrityError:
-                        # skip duplicates gracefully
-                        continue
-        conn.commit()
-        conn.close()
+    exporter = _EXPORTERS.get(format_type)
+    if exporter is not None:
+        exporter(output_path, device_groups, now.isoformat() + "Z", include_timestamps, include_at_commands)
     return str(output_path.resolve())
 
 def generate_combined_at_file(device_groups: List[Dict[str, object]], output_path: str, which: str = "both", interface: str = DEFAULT_LTE_INTERFACE) -> str:
     Path(Path(output_path).parent).mkdir(parents=True, exist_ok=True)
+    want_mikrotik = which in ("mikrotik", "both")
+    want_fiberhome = which in ("fiberhome", "both")
     with open(output_path, "w", encoding="utf-8") as fh:
-        fh.write(f"# Combined AT commands ({which})\n")
-        fh.write(f"# Generated: {datetime.utcnow().isoformat()}Z\n\n")
+        fh.write(f"# Combined AT commands ({which})\n"
+                 f"# Generated: {_utc_now().isoformat()}Z\n\n")
+        # one write per device: bounded memory, far fewer calls than one per line
         for group in device_groups:
             device_name = group.get("name", "Unknown Device")
             imeis_map: Dict[str, List[str]] = group.get("imeis", {})
-            fh.write(f"# Device: {device_name}\n")
+            parts = [f"# Device: {device_name}\n"]
             for tac_val, imeis in imeis_map.items():
-                fh.write(f"# TAC: {tac_val}\n")
-                for imei in imeis:
-                    if which in ("mikrotik", "both"):
-                        fh.write(mikrotik_at_command_for_imei(imei, interface) + "\n")
-                    if which in ("fiberhome", "both"):
-                        fh.write(fiberhome_at_command_for_imei(imei) + "\n")
-                fh.write("\n")
+                parts.append(f"# TAC: {tac_val}\n")
+                parts.extend(_at_command_lines(imeis, want_mikrotik, want_fiberhome, interface))
+                parts.append("\n")
+            fh.write("".join(parts))
     return str(Path(output_path).resolve())
 
 # -------------------------
 # Source editing: add device into this .py
 # -------------------------
+# the DEVICE_DATABASE literal up to its closing "]" at the start of a line
+_DEVICE_DATABASE_BLOCK_RE = re.compile(r"^DEVICE_DATABASE: List\[Dict\[str, Any\]\] = \[.*?^\]", re.DOTALL | re.MULTILINE)
+
 def add_device_to_source_file(tacs: List[str], name: str, model: str, type_str: str, source_path: Optional[str] = None) -> Tuple[bool, str]:
     """
     Insert a new device dict into DEVICE_DATABASE inside this source file.
@@ -386,35 +617,20 @@ def add_device_to_source_file(tacs: List[str], name: str, model: str, type_str:
         return False, f"Source file not found: {source_file}"
 
     # Normalize type
-    chosen_type = "OTHER"
     ts = type_str.strip().upper()
-    for t in DeviceType:
-        if t.name == ts:
-            chosen_type = t.name
-            break
-    if chosen_type == "OTHER" and ts in ("IOT", "IOT DEVICE"):
-        chosen_type = "IOT"
+    chosen = _DEVICETYPE_BY_NAME.get(ts)
+    if chosen is None:
+        chosen = DeviceType.IOT if ts == "IOT DEVICE" else DeviceType.OTHER
+    chosen_type = chosen.name
 
     # Read source
     content = source_file.read_text(encoding="utf-8")
 
-    # Find insertion point: locate the DEVICE_DATABASE definition and its closing bracket
-    start_marker = "DEVICE_DATABASE: List[Dict[str, Any]] = ["
-    start_idx = content.find(start_marker)
-    if start_idx == -1:
+    # Find insertion point: the start of the line holding the DEVICE_DATABASE closing bracket
+    match = _DEVICE_DATABASE_BLOCK_RE.search(content)
+    if match is None:
         return False, "Could not locate DEVICE_DATABASE block in source."
-    # find the closing bracket ']' that ends the list (search from start_idx)
-    close_idx = content.find("\n]", start_idx)
-    if close_idx == -1:
-        # fallback: find the last ']' before next major section
-        # try finding the pattern that follows (Terminal color helpers)
-        follow_marker = "\n# -------------------------\n# Terminal color helpers"
-        follow_idx = content.find(follow_marker, start_idx)
-        if follow_idx == -1:
-            return False, "Could not determine end of DEVICE_DATABASE block."
-        close_idx = content.rfind("]", start_idx, follow_idx)
-        if close_idx == -1:
-            return False, "Could not determine end of DEVICE_DATABASE block."
+    close_idx = match.end() - 1
 
     # Build new entry text: keep consistent 4-space indent
     # Format tac list as JSON-like Python list
@@ -422,7 +638,7 @@ def add_device_to_source_file(tacs: List[str], name: str, model: str, type_str:
     new_entry = f'    {{"tac": {tacs_literal}, "name": "{name}", "model": "{model}", "type": DeviceType.{chosen_type}}},\n'
 
     # Backup
-    backup_path = source_file.with_suffix(source_file.suffix + f".bak.{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}")
+    backup_path = source_file.with_suffix(source_file.suffix + f".bak.{_utc_now().strftime(FILE_TIMESTAMP_FORMAT)}")
     shutil.copy2(source_file, backup_path)
 
     # Insert before close_idx
@@ -435,7 +651,12 @@ def add_device_to_source_file(tacs: List[str], name: str, model: str, type_str:
 # UI helpers & interactive view
 # -------------------------
 def clear_terminal_screen() -> None:
-    os.system("cls" if os.name == "nt" else "clear")
+    if sys.stdout.isatty() and os.environ.get("TERM") != "dumb":
+        # ANSI erase + cursor home; no subprocess per redraw
+        sys.stdout.write("\x1b[2J\x1b[H")
+        sys.stdout.flush()
+    else:
+        os.system("cls" if os.name == "nt" else "clear")
 
 def pause_for_user(message: str = "Press Enter to continue...") -> None:
     try:
@@ -444,9 +665,10 @@ def pause_for_user(message: str = "Press Enter to continue...") -> None:
         pass
 
 def show_help_menu(use_color: bool) -> None:
+    color = make_color_fn(use_color)
     clear_terminal_screen()
-    print(apply_color("IMEI Atlas - Help Menu", Colors.BOLD + Colors.CYAN, use_color))
-    print(apply_color("=" * 40, Colors.DIM, use_color))
+    print(color("IMEI Atlas - Help Menu", Colors.BOLD + Colors.CYAN))
+    print(color("=" * 40, Colors.DIM))
     print("Commands:")
     print("  a/mikrotik  - Show MikroTik AT commands (all TACs)")
     print("  f/fiberhome - Show FiberHome AT commands (all TACs)")
@@ -456,7 +678,7 @@ def show_help_menu(use_color: bool) -> None:
     print("  b/back      - Return to main menu")
     print("  q/quit      - Exit program")
     print()
-    print(apply_color(DISCLAIMER, Colors.YELLOW, use_color))
+    print(color(DISCLAIMER, Colors.YELLOW))
     pause_for_user()
 
 def device_menu_view(device_group: Dict[str, object], imei_generator: IMEIGenerator, use_color: bool) -> bool:
@@ -467,25 +689,50 @@ def device_menu_view(device_group: Dict[str, object], imei_generator: IMEIGenera
       - 'tacs': List[str]
       - 'imeis': Dict[tac] -> List[str]
     """
+    color = make_color_fn(use_color)
+    # Luhn results per TAC, reused across redraws and the validate table until
+    # regeneration swaps in a new IMEI list
+    mods_cache: Dict[str, Tuple[List[str], List[Optional[int]]]] = {}
+
+    def mods_for(tac: str, imei_list: List[str]) -> List[Optional[int]]:
+        cached = mods_cache.get(tac)
+        if cached is None or cached[0] is not imei_list:
+            cached = mods_cache[tac] = (imei_list, luhn_checksum_mod10_batch(imei_list))
+        return cached[1]
+
+    # rendered device panel; rebuilt only after the IMEIs change (regenerate),
+    # every other redraw just rewrites it in one call
+    panel: Optional[str] = None
+    # fixed color wrappers for the per-IMEI lines and the validate STATUS cell
+    ok_open, bad_open, close = (Colors.GREEN, Colors.RED, _RESET) if use_color else ("", "", "")
+    valid_cell = f"{color('VALID', Colors.GREEN):>6s}"
+    invalid_cell = f"{color('INVALID', Colors.RED):>6s}"
+
     while True:
         clear_terminal_screen()
         name = device_group.get("name", "Unknown Device")
         tacs = device_group.get("tacs", [])
         imeis_map: Dict[str, List[str]] = device_group.get("imeis", {})
-        print(apply_color(f"Device: {name}", Colors.BOLD + Colors.CYAN, use_color))
-        print(apply_color("-" * 44, Colors.DIM, use_color))
-
-        # Print IMEIs grouped by TAC
-        for tac in tacs:
-            imei_list = imeis_map.get(tac, [])
-            print(apply_color(f"TAC: {tac}  —  {len(imei_list)} IMEI(s)", Colors.BOLD + Colors.YELLOW, use_color))
-            for idx, imei_value in enumerate(imei_list, start=1):
-                color_code = Colors.GREEN if validate_imei(imei_value) else Colors.RED
-                print(f"  {idx:2d}. {apply_color(imei_value, color_code, use_color)}")
-            print()
-
-        print(apply_color("Commands: a=mikrotik  f=fiberhome  s=save  v=validate  r=regenerate  h=help  b=back  q=quit", Colors.DIM, use_color))
-        cmd = input(apply_color("Enter command: ", Colors.YELLOW, use_color)).strip().lower()
+        if panel is None:
+            lines = [
+                color(f"Device: {name}", Colors.BOLD + Colors.CYAN),
+                color("-" * 44, Colors.DIM),
+            ]
+
+            # IMEIs grouped by TAC
+            for tac in tacs:
+                imei_list = imeis_map.get(tac, [])
+                lines.append(color(f"TAC: {tac}  —  {len(imei_list)} IMEI(s)", Colors.BOLD + Colors.YELLOW))
+                mods = mods_for(tac, imei_list)
+                lines.extend(f"  {idx:2d}. {ok_open if mod == 0 else bad_open}{imei_value}{close}"
+                             for idx, (imei_value, mod) in enumerate(zip(imei_list, mods), start=1))
+                lines.append("")
+
+            lines.append(color("Commands: a=mikrotik  f=fiberhome  s=save  v=validate  r=regenerate  h=help  b=back  q=quit", Colors.DIM))
+            panel = "\n".join(lines) + "\n"
+        sys.stdout.write(panel)
+        sys.stdout.flush()
+        cmd = input(color("Enter command: ", Colors.YELLOW)).strip().lower()
 
         if cmd in ("b", "0", "back"):
             return False
@@ -497,7 +744,7 @@ def device_menu_view(device_group: Dict[str, object], imei_generator: IMEIGenera
 
         if cmd in ("a", "at", "show"):
             print()
-            print(apply_color("# MikroTik AT commands:", Colors.BOLD + Colors.CYAN, use_color))
+            print(color("# MikroTik AT commands:", Colors.BOLD + Colors.CYAN))
             for tac, imei_list in imeis_map.items():
                 for imei in imei_list:
                     print(mikrotik_at_command_for_imei(imei))
@@ -507,7 +754,7 @@ def device_menu_view(device_group: Dict[str, object], imei_generator: IMEIGenera
 
         if cmd in ("f", "fiberhome"):
             print()
-            print(apply_color("# FiberHome AT commands:", Colors.BOLD + Colors.CYAN, use_color))
+            print(color("# FiberHome AT commands:", Colors.BOLD + Colors.CYAN))
             for tac, imei_list in imeis_map.items():
                 for imei in imei_list:
                     print(fiberhome_at_command_for_imei(imei))
@@ -517,13 +764,15 @@ def device_menu_view(device_group: Dict[str, object], imei_generator: IMEIGenera
 
         if cmd in ("s", "save"):
             # Save per TAC file
-            include_both_resp = input(apply_color("Include both Mikrotik & FiberHome commands? (Y/n): ", Colors.YELLOW, use_color)).strip().lower()
+            include_both_resp = input(color("Include both Mikrotik & FiberHome commands? (Y/n): ", Colors.YELLOW)).strip().lower()
             include_both = True if include_both_resp in ("", "y", "yes") else "mikrotik" if include_both_resp == "m" else "fiberhome"
             saved_files = []
+            generated_at = _utc_now().isoformat() + "Z"
             for tac, imei_list in imeis_map.items():
-                saved = save_at_commands_to_file(name, tac, imei_list, output_dir=AT_OUTPUT_DIRECTORY, include_both=include_both)
+                saved = save_at_commands_to_file(name, tac, imei_list, output_dir=AT_OUTPUT_DIRECTORY, include_both=include_both,
+                                                 generated_at=generated_at)
                 saved_files.append(saved)
-            print(apply_color("Saved AT files:", Colors.GREEN, use_color))
+            print(color("Saved AT files:", Colors.GREEN))
             for sf in saved_files:
                 print(sf)
             pause_for_user()
@@ -532,95 +781,95 @@ def device_menu_view(device_group: Dict[str, object], imei_generator: IMEIGenera
         if cmd in ("v", "validate"):
             print()
             header = f"{'TAC':10s} {'IMEI':16s} {'CHK':^4s} {'MOD':^4s} {'STATUS':>6s}"
-            print(apply_color(header, Colors.BOLD + Colors.CYAN, use_color))
+            print(color(header, Colors.BOLD + Colors.CYAN))
             for tac, imei_list in imeis_map.items():
-                for imei in imei_list:
+                for imei, mod in zip(imei_list, mods_for(tac, imei_list)):
                     chk_digit = imei[-1]
-                    mod_value = str(luhn_checksum_mod10(imei))
-                    ok_text = "VALID" if validate_imei(imei) else "INVALID"
-                    color_code = Colors.GREEN if ok_text == "VALID" else Colors.RED
-                    print(f"{tac:10s} {imei:16s} {chk_digit:^4s} {mod_value:^4s} {apply_color(ok_text, color_code, use_color):>6s}")
+                    mod_value = "-" if mod is None else str(mod)
+                    print(f"{tac:10s} {imei:16s} {chk_digit:^4s} {mod_value:^4s} {valid_cell if mod == 0 else invalid_cell}")
             pause_for_user()
             continue
 
         if cmd in ("r", "regen", "regenerate"):
             try:
-                new_count_input = input(apply_color(f"Enter new count per TAC (current: {len(next(iter(imeis_map.values()))) if imeis_map else 0}): ", Colors.YELLOW, use_color)).strip()
+                new_count_input = input(color(f"Enter new count per TAC (current: {len(next(iter(imeis_map.values()))) if imeis_map else 0}): ", Colors.YELLOW)).strip()
                 if new_count_input:
                     new_count = int(new_count_input)
                 else:
                     new_count = len(next(iter(imeis_map.values()))) if imeis_map else DEFAULT_IMEIS_PER_DEVICE
                 if new_count < 1 or new_count > MAX_IMEI_GENERATION:
-                    print(apply_color(f"Count must be between 1 and {MAX_IMEI_GENERATION}. Aborting.", Colors.RED, use_color))
+                    print(color(f"Count must be between 1 and {MAX_IMEI_GENERATION}. Aborting.", Colors.RED))
                     pause_for_user()
                     continue
             except Exception:
-                print(apply_color("Invalid number. Keeping current count.", Colors.RED, use_color))
+                print(color("Invalid number. Keeping current count.", Colors.RED))
                 pause_for_user()
                 continue
 
+            panel = None  # IMEI lists are replaced below
             try:
                 for tac in tacs:
                     device_group["imeis"][tac] = imei_generator.generate_batch_imeis(tac, new_count)
-                print(apply_color(f"Regenerated {new_count} IMEIs per TAC for this device.", Colors.GREEN, use_color))
+                print(color(f"Regenerated {new_count} IMEIs per TAC for this device.", Colors.GREEN))
             except Exception as e:
-                print(apply_color(f"Error during regeneration: {e}", Colors.RED, use_color))
+                print(color(f"Error during regeneration: {e}", Colors.RED))
             pause_for_user()
             continue
 
-        print(apply_color("Unknown command. Type 'h' for help.", Colors.YELLOW, use_color))
+        print(color("Unknown command. Type 'h' for help.", Colors.YELLOW))
         pause_for_user()
 
 # -------------------------
 # Non-interactive helpers
 # -------------------------
 def run_imei_validator_prompt(use_color: bool) -> None:
+    color = make_color_fn(use_color)
     clear_terminal_screen()
-    print(apply_color("IMEI VALIDATOR (Luhn Check)", Colors.BOLD + Colors.CYAN, use_color))
-    imei_input = input(apply_color("Enter IMEI to validate: ", Colors.YELLOW, use_color)).strip()
+    print(color("IMEI VALIDATOR (Luhn Check)", Colors.BOLD + Colors.CYAN))
+    imei_input = input(color("Enter IMEI to validate: ", Colors.YELLOW)).strip()
     if not imei_input.isdigit():
-        print(apply_color("IMEI must contain only digits!", Colors.RED, use_color))
+        print(color("IMEI must contain only digits!", Colors.RED))
     elif len(imei_input) != 15:
-        print(apply_color("IMEI must be exactly 15 digits!", Colors.RED, use_color))
+        print(color("IMEI must be exactly 15 digits!", Colors.RED))
     else:
         if validate_imei(imei_input):
-            print(apply_color(f"IMEI {imei_input} is VALID ✅", Colors.GREEN, use_color))
+            print(color(f"IMEI {imei_input} is VALID ✅", Colors.GREEN))
         else:
-            print(apply_color(f"IMEI {imei_input} is INVALID ❌", Colors.RED, use_color))
+            print(color(f"IMEI {imei_input} is INVALID ❌", Colors.RED))
     pause_for_user()
 
 def run_luhn_step_by_step(use_color: bool) -> None:
+    color = make_color_fn(use_color)
     clear_terminal_screen()
-    print(apply_color("Luhn Algorithm Step-by-Step Analysis", Colors.BOLD + Colors.CYAN, use_color))
-    number = input(apply_color("Enter a number to analyze: ", Colors.YELLOW, use_color)).strip()
+    print(color("Luhn Algorithm Step-by-Step Analysis", Colors.BOLD + Colors.CYAN))
+    number = input(color("Enter a number to analyze: ", Colors.YELLOW)).strip()
     if not number.isdigit():
-        print(apply_color("Input must contain only digits!", Colors.RED, use_color))
+        print(color("Input must contain only digits!", Colors.RED))
         pause_for_user()
         return
-    digits = [int(d) for d in number]
-    print("\n" + apply_color("Step-by-step analysis:", Colors.BOLD, use_color))
+    # ASCII input is converted in one translate; other Unicode digits go through int()
+    digits = list(number.encode().translate(_LUHN_PLAIN_TABLE)) if number.isascii() else [int(d) for d in number]
+    print("\n" + color("Step-by-step analysis:", Colors.BOLD))
     reversed_digits = digits[::-1]
-    print(f"Original number: {' '.join(str(d) for d in digits)}")
+    doubled = reversed_digits[:]
+    doubled[1::2] = [d * 2 for d in reversed_digits[1::2]]
+    adjusted = reversed_digits[:]
+    adjusted[1::2] = [_LUHN_DOUBLED[d] for d in reversed_digits[1::2]]
+    adjusted_text = list(map(str, adjusted))
+    print(f"Original number: {' '.join(map(str, digits))}")
     print(f"Number of digits: {len(digits)}")
-    print(f"\n1. Reverse the number: {' '.join(str(d) for d in reversed_digits)}")
-    doubled = []
-    for idx, digit in enumerate(reversed_digits):
-        if idx % 2 == 1:
-            doubled.append(digit * 2)
-        else:
-            doubled.append(digit)
+    print(f"\n1. Reverse the number: {' '.join(map(str, reversed_digits))}")
     print("2. Double every second digit (starting from the second):")
-    print(f"   After doubling: {' '.join(str(d) for d in doubled)}")
-    adjusted = [d - 9 if d > 9 else d for d in doubled]
+    print(f"   After doubling: {' '.join(map(str, doubled))}")
     print("3. Adjust numbers greater than 9 (subtract 9):")
-    print(f"   After adjustment: {' '.join(str(d) for d in adjusted)}")
+    print(f"   After adjustment: {' '.join(adjusted_text)}")
     total_sum = sum(adjusted)
-    print(f"4. Sum all digits: {' + '.join(str(d) for d in adjusted)} = {total_sum}")
+    print(f"4. Sum all digits: {' + '.join(adjusted_text)} = {total_sum}")
     print(f"5. Check if sum is divisible by 10: {total_sum} % 10 == {total_sum % 10}")
     if total_sum % 10 == 0:
-        print(apply_color(f"\nResult: The number {number} is VALID ✅", Colors.GREEN, use_color))
+        print(color(f"\nResult: The number {number} is VALID ✅", Colors.GREEN))
     else:
-        print(apply_color(f"\nResult: The number {number} is INVALID ❌", Colors.RED, use_color))
+        print(color(f"\nResult: The number {number} is INVALID ❌", Colors.RED))
     pause_for_user()
 
 # -------------------------
@@ -634,9 +883,12 @@ def main(imeis_per_device: int = DEFAULT_IMEIS_PER_DEVICE,
          at_interface: str = DEFAULT_LTE_INTERFACE,
          add_tac_tuple: Optional[Tuple[List[str], str, str, str]] = None):
     use_color = (not no_color) and USE_COLOR_BY_DEFAULT
+    color = make_color_fn(use_color)
+    if os.name == "nt":
+        os.system("")  # enables ANSI escape processing in the Windows console
 
     clear_terminal_screen()
-    print(apply_color(DISCLAIMER, Colors.YELLOW + Colors.BOLD, use_color))
+    print(color(DISCLAIMER, Colors.YELLOW + Colors.BOLD))
     print()
     pause_for_user("Press Enter to acknowledge and continue...")
 
@@ -644,26 +896,11 @@ def main(imeis_per_device: int = DEFAULT_IMEIS_PER_DEVICE,
 
     # Pre-generate device_groups with tacs list and imeis mapping
     device_groups: List[Dict[str, object]] = []
-    for device in DEVICE_DATABASE:
-        tacs_raw = device.get("tac", [])
-        if isinstance(tacs_raw, str):
-            # allow '|' separated string as legacy
-            tacs_list = [t.strip() for t in tacs_raw.split("|") if t.strip()]
-        elif isinstance(tacs_raw, (list, tuple)):
-            tacs_list = list(tacs_raw)
-        else:
-            tacs_list = []
-
+    for prepared in _PREPARED_DEVICES:
         imeis_map: Dict[str, List[str]] = {}
-        for tac_val in tacs_list:
+        for tac_val in prepared["tacs"]:
             imeis_map[tac_val] = imei_generator.generate_batch_imeis(tac_val, imeis_per_device)  # returns list
-
-        device_groups.append({
-            "tacs": tacs_list,
-            "name": f"{device.get('name','Unknown')} {device.get('model','')}".strip(),
-            "imeis": imeis_map,
-            "type": device.get("type").value if isinstance(device.get("type"), DeviceType) else str(device.get("type", "Unknown"))
-        })
+        device_groups.append({**prepared, "tacs": list(prepared["tacs"]), "imeis": imeis_map})
 
     # If add_tac_tuple provided, add to source and exit
     if add_tac_tuple:
@@ -678,7 +915,7 @@ def main(imeis_per_device: int = DEFAULT_IMEIS_PER_DEVICE,
     # If non-interactive AT generation requested
     if non_interactive_at:
         if not at_output:
-            at_output = os.path.join(AT_OUTPUT_DIRECTORY, f"combined_at_{non_interactive_at}_{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.txt")
+            at_output = os.path.join(AT_OUTPUT_DIRECTORY, f"combined_at_{non_interactive_at}_{_utc_now().strftime(FILE_TIMESTAMP_FORMAT)}.txt")
         try:
             saved = generate_combined_at_file(device_groups, at_output, which=non_interactive_at, interface=at_interface)
             print(f"Saved combined AT commands to: {saved}")
@@ -689,70 +926,85 @@ def main(imeis_per_device: int = DEFAULT_IMEIS_PER_DEVICE,
     # Interactive loop
     search_term = ""
     filtered_devices = device_groups
+    # the menu text and option numbers only change with the filter, so they
+    # are rebuilt after a search and otherwise rewritten as-is
+    menu_text: Optional[str] = None
 
     while True:
         clear_terminal_screen()
-        print(apply_color("IMEI Atlas", Colors.BOLD + Colors.CYAN, use_color))
-        print(apply_color("=" * 44, Colors.DIM, use_color))
-        print(apply_color(f"Author: {AUTHOR_NAME}", Colors.DIM, use_color))
-        print(apply_color(f"Devices: {len(filtered_devices)}/{len(device_groups)} | IMEIs per TAC: {imeis_per_device}", Colors.DIM, use_color))
-        if search_term:
-            print(apply_color(f"Filter: '{search_term}'", Colors.YELLOW, use_color))
-        print()
-
-        for index, group in enumerate(filtered_devices, start=1):
-            device_type = group.get("type", "Unknown")
-            print(apply_color(f"{index:2d}. {group['name']} [{device_type}]", Colors.GREEN, use_color))
-
-        random_option_index = len(filtered_devices) + 1
-        custom_tac_index = len(filtered_devices) + 2
-        partial_tac_index = len(filtered_devices) + 3  # New option
-        check_imei_index = len(filtered_devices) + 4
-        luhn_index = len(filtered_devices) + 5
-        all_export_index = len(filtered_devices) + 6
-        search_index = len(filtered_devices) + 7
-        help_index = len(filtered_devices) + 8
-
-        print(apply_color(f"{random_option_index:2d}. Generate random IMEIs (different TACs)", Colors.CYAN, use_color))
-        print(apply_color(f"{custom_tac_index:2d}. Generate IMEIs with custom TAC(s)", Colors.CYAN, use_color))
-        print(apply_color(f"{partial_tac_index:2d}. Generate IMEI with partial TAC (1-8 digits)", Colors.CYAN, use_color))  # New option
-        print(apply_color(f"{check_imei_index:2d}. Check your IMEI (Luhn)", Colors.CYAN, use_color))
-        print(apply_color(f"{luhn_index:2d}. Luhn Algorithm Step-by-Step Analysis", Colors.CYAN, use_color))
-        print(apply_color(f"{all_export_index:2d}. Export ALL IMEIs (multiple formats)", Colors.CYAN, use_color))
-        print(apply_color(f"{search_index:2d}. Search/filter devices", Colors.CYAN, use_color))
-        print(apply_color(f"{help_index:2d}. Help", Colors.CYAN, use_color))
-        print()
-        print(apply_color("Select a device number to view (q to quit).", Colors.DIM, use_color))
-
-        choice = input(apply_color("Enter choice: ", Colors.YELLOW, use_color)).strip().lower()
+        if menu_text is None:
+            # the whole menu is collected and written to the terminal in one call
+            lines = [
+                color("IMEI Atlas", Colors.BOLD + Colors.CYAN),
+                color("=" * 44, Colors.DIM),
+                color(f"Author: {AUTHOR_NAME}", Colors.DIM),
+                color(f"Devices: {len(filtered_devices)}/{len(device_groups)} | IMEIs per TAC: {imeis_per_device}", Colors.DIM),
+            ]
+            if search_term:
+                lines.append(color(f"Filter: '{search_term}'", Colors.YELLOW))
+            lines.append("")
+
+            for index, group in enumerate(filtered_devices, start=1):
+                device_type = group.get("type", "Unknown")
+                lines.append(color(f"{index:2d}. {group['name']} [{device_type}]", Colors.GREEN))
+
+            random_option_index = len(filtered_devices) + 1
+            custom_tac_index = len(filtered_devices) + 2
+            partial_tac_index = len(filtered_devices) + 3  # New option
+            check_imei_index = len(filtered_devices) + 4
+            luhn_index = len(filtered_devices) + 5
+            all_export_index = len(filtered_devices) + 6
+            search_index = len(filtered_devices) + 7
+            help_index = len(filtered_devices) + 8
+
+            lines += [
+                color(f"{random_option_index:2d}. Generate random IMEIs (different TACs)", Colors.CYAN),
+                color(f"{custom_tac_index:2d}. Generate IMEIs with custom TAC(s)", Colors.CYAN),
+                color(f"{partial_tac_index:2d}. Generate IMEI with partial TAC (1-8 digits)", Colors.CYAN),  # New option
+                color(f"{check_imei_index:2d}. Check your IMEI (Luhn)", Colors.CYAN),
+                color(f"{luhn_index:2d}. Luhn Algorithm Step-by-Step Analysis", Colors.CYAN),
+                color(f"{all_export_index:2d}. Export ALL IMEIs (multiple formats)", Colors.CYAN),
+                color(f"{search_index:2d}. Search/filter devices", Colors.CYAN),
+                color(f"{help_index:2d}. Help", Colors.CYAN),
+                "",
+                color("Select a device number to view (q to quit).", Colors.DIM),
+            ]
+            menu_text = "\n".join(lines) + "\n"
+            n_devices = len(filtered_devices)
+            check_imei_key, luhn_key, all_export_key, search_key, help_key = (
+                str(check_imei_index), str(luhn_index), str(all_export_index), str(search_index), str(help_index))
+        sys.stdout.write(menu_text)
+        sys.stdout.flush()
+
+        choice = input(color("Enter choice: ", Colors.YELLOW)).strip().lower()
 
         if choice in ("q", "quit", "exit"):
-            print(apply_color("Goodbye.", Colors.DIM, use_color))
+            print(color("Goodbye.", Colors.DIM))
             return
 
-        if choice == str(check_imei_index):
+        if choice == check_imei_key:
             run_imei_validator_prompt(use_color)
             continue
-        if choice == str(luhn_index):
+        if choice == luhn_key:
             run_luhn_step_by_step(use_color)
             continue
 
-        if choice == str(all_export_index):
+        if choice == all_export_key:
             clear_terminal_screen()
-            print(apply_color("Export ALL IMEIs", Colors.BOLD + Colors.CYAN, use_color))
+            print(color("Export ALL IMEIs", Colors.BOLD + Colors.CYAN))
             print()
-            print(apply_color("Available formats:", Colors.BOLD, use_color))
+            print(color("Available formats:", Colors.BOLD))
             print("1. Text (TXT)")
             print("2. CSV")
             print("3. JSON")
             print("4. SQLite Database")
-            format_choice = input(apply_color("Select format [1-4]: ", Colors.YELLOW, use_color)).strip()
+            format_choice = input(color("Select format [1-4]: ", Colors.YELLOW)).strip()
             format_map = {"1": "txt", "2": "csv", "3": "json", "4": "sqlite"}
             format_type = format_map.get(format_choice, "txt")
-            default_filename = f"all_imeis_{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.{format_type}"
-            user_filename = input(apply_color(f"Enter output filename (enter for default: {default_filename}): ", Colors.YELLOW, use_color)).strip()
+            default_filename = f"all_imeis_{_utc_now().strftime(FILE_TIMESTAMP_FORMAT)}.{format_type}"
+            user_filename = input(color(f"Enter output filename (enter for default: {default_filename}): ", Colors.YELLOW)).strip()
             filename_to_use = user_filename if user_filename else default_filename
-            include_at = input(apply_color("Include MikroTik AT commands? (y/N): ", Colors.YELLOW, use_color)).strip().lower() == "y"
+            include_at = input(color("Include MikroTik AT commands? (y/N): ", Colors.YELLOW)).strip().lower() == "y"
             try:
                 saved_file_path = save_all_devices_imeis_to_file(
                     device_groups,
@@ -762,38 +1014,40 @@ def main(imeis_per_device: int = DEFAULT_IMEIS_PER_DEVICE,
                     include_at_commands=include_at,
                     format_type=format_type
                 )
-                print(apply_color(f"Saved ALL IMEIs to {saved_file_path}", Colors.GREEN, use_color))
+                print(color(f"Saved ALL IMEIs to {saved_file_path}", Colors.GREEN))
             except Exception as exc:
-                print(apply_color(f"Failed to save file: {exc}", Colors.RED, use_color))
+                print(color(f"Failed to save file: {exc}", Colors.RED))
             pause_for_user()
             continue
 
-        if choice == str(search_index):
-            search_term = input(apply_color("Enter search term (leave empty to clear): ", Colors.YELLOW, use_color)).strip()
-            filtered_devices = [d for d in device_groups if search_term.lower() in d.get("name","").lower()] if search_term else device_groups
+        if choice == search_key:
+            search_term = input(color("Enter search term (leave empty to clear): ", Colors.YELLOW)).strip()
+            needle = search_term.lower()
+            filtered_devices = [d for d in device_groups if needle in d["_search"]] if search_term else device_groups
+            menu_text = None
             continue
 
-        if choice == str(help_index):
+        if choice == help_key:
             show_help_menu(use_color)
             continue
 
         if not choice.isdigit():
-            print(apply_color("Please enter a number.", Colors.RED, use_color))
+            print(color("Please enter a number.", Colors.RED))
             pause_for_user()
             continue
 
         idx = int(choice) - 1
 
         # Random IMEIs option
-        if idx == len(filtered_devices):
+        if idx == n_devices:
             try:
-                random_count_input = input(apply_color("Enter number of random IMEIs to generate (default 10): ", Colors.YELLOW, use_color)).strip()
+                random_count_input = input(color("Enter number of random IMEIs to generate (default 10): ", Colors.YELLOW)).strip()
                 random_count = 10 if not random_count_input else int(random_count_input)
                 if random_count < 1 or random_count > MAX_IMEI_GENERATION:
-                    print(apply_color(f"Count must be between 1 and {MAX_IMEI_GENERATION}. Using default 10.", Colors.RED, use_color))
+                    print(color(f"Count must be between 1 and {MAX_IMEI_GENERATION}. Using default 10.", Colors.RED))
                     random_count = 10
             except ValueError:
-                print(apply_color("Invalid number. Using default 10.", Colors.RED, use_color))
+                print(color("Invalid number. Using default 10.", Colors.RED))
                 random_count = 10
             temp_group = {"tacs": ["Various"], "name": "Random IMEIs (different TACs)", "imeis": {"Various": imei_generator.generate_batch_imeis("Various", random_count)}}
             should_quit = device_menu_view(temp_group, imei_generator, use_color)
@@ -802,16 +1056,15 @@ def main(imeis_per_device: int = DEFAULT_IMEIS_PER_DEVICE,
             continue
 
         # Custom TAC(s) option
-        if idx == len(filtered_devices) + 1:
-            tac_input = input(apply_color("Enter the TAC(s) (8 digits each). For multiple, separate with '|': ", Colors.YELLOW, use_color)).strip()
+        if idx == n_devices + 1:
+            tac_input = input(color("Enter the TAC(s) (8 digits each). For multiple, separate with '|': ", Colors.YELLOW)).strip()
             if not tac_input:
-                print(apply_color("No TAC provided. Returning to menu.", Colors.RED, use_color))
+                print(color("No TAC provided. Returning to menu.", Colors.RED))
                 pause_for_user()
                 continue
-            tac_list = [t.strip() for t in tac_input.split("|") if t.strip()]
-            invalid = [t for t in tac_list if not (t.isdigit() and len(t) == 8)]
+            tac_list, invalid = _split_tacs(tac_input)
             if invalid:
-                print(apply_color(f"Invalid TACs: {invalid}. Returning to menu.", Colors.RED, use_color))
+                print(color(f"Invalid TACs: {invalid}. Returning to menu.", Colors.RED))
                 pause_for_user()
                 continue
             imeis_map: Dict[str, List[str]] = {}
@@ -824,10 +1077,10 @@ def main(imeis_per_device: int = DEFAULT_IMEIS_PER_DEVICE,
             continue
 
         # Partial TAC option
-        if idx == len(filtered_devices) + 2:
-            partial_tac_input = input(apply_color("Enter partial TAC (1-8 digits): ", Colors.YELLOW, use_color)).strip()
+        if idx == n_devices + 2:
+            partial_tac_input = input(color("Enter partial TAC (1-8 digits): ", Colors.YELLOW)).strip()
             if not partial_tac_input.isdigit() or not (1 <= len(partial_tac_input) <= 8):
-                print(apply_color("Invalid input. Must be 1-8 digits.", Colors.RED, use_color))
+                print(color("Invalid input. Must be 1-8 digits.", Colors.RED))
                 pause_for_user()
                 continue
             
@@ -839,13 +1092,13 @@ def main(imeis_per_device: int = DEFAULT_IMEIS_PER_DEVICE,
                 if should_quit:
                     return
             except Exception as e:
-                print(apply_color(f"Error generating IMEIs: {e}", Colors.RED, use_color))
+                print(color(f"Error generating IMEIs: {e}", Colors.RED))
                 pause_for_user()
             continue
 
         # Normal device selection
-        if idx < 0 or idx >= len(filtered_devices):
-            print(apply_color("Invalid selection.", Colors.RED, use_color))
+        if idx < 0 or idx >= n_devices:
+            print(color("Invalid selection.", Colors.RED))
             pause_for_user()
             continue
 
@@ -893,8 +1146,7 @@ if __name__ == "__main__":
             print("Invalid --add-tac format. Use: --add-tac 'TAC1|TAC2,Name,Model,Type'")
             sys.exit(1)
         tac_field = parts[0]
-        tacs_list = [t.strip() for t in tac_field.split("|") if t.strip()]
-        invalids = [t for t in tacs_list if not (t.isdigit() and len(t) == 8)]
+        tacs_list, invalids = _split_tacs(tac_field)
         if invalids:
             print(f"Invalid TAC(s): {invalids}. Each TAC must be 8 digits.")
             sys.exit(1)
@@ -10,7 +10,13 @@ import sys
 import os
 import random
 import secrets
-from datetime import datetime
+from datetime import datetime, timezone
+from itertools import repeat
+
+try:
+    import readline  # noqa: F401  line editing and history for input()
+except ImportError:  # not available on Windows
+    pass
 
 # ----- Configuration -----
 AUTHOR_NAME = "ﺐﻴﻐﻟﺍ ﺮﻬﻈﺑ ﻲﻟ ﻮﻋﺪﺗ نﺍ ﻞﻤﻌﻟﺍ اﺬﻫ مﺍﺪﺨﺘﺳﺍ ﻦﻤﺛ"
@@ -71,15 +77,59 @@ GREEN = "\x1b[32m"
 CYAN = "\x1b[36m"
 YELLOW = "\x1b[33m"
 
-def color(s, code):
-    """Apply color to text if enabled"""
-    return s if not USE_COLOR else f"{code}{s}{RESET}"
+def _colored(s, code):
+    """Wrap text in an ANSI color code"""
+    return f"{code}{s}{RESET}"
+
+def _plain(s, code):
+    """Return text unchanged (colors disabled)"""
+    return s
+
+# Apply color to text if enabled; main() rebinds this once instead of
+# checking USE_COLOR on every call
+color = _colored if USE_COLOR else _plain
+
+# Fixed prompts, rebuilt by main() if colors get disabled
+_PROMPT_CMD = color("Enter command: ", YELLOW)
+_PROMPT_CHOICE = color("Enter choice: ", YELLOW)
 
 # ----- Luhn Algorithm Functions -----
+# Luhn contribution of a doubled digit (2*d, minus 9 when above 9)
+_DOUBLED = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+# ASCII digit -> Luhn contribution at a plain / doubled position
+_PLAIN_TABLE = bytes.maketrans(b"0123456789", bytes(range(10)))
+_DOUBLE_TABLE = bytes.maketrans(b"0123456789", bytes(_DOUBLED))
+_CHECK_DIGIT = "0987654321"
+
+# IMEIs are always 15 digits: generate an unrolled checksum with one
+# 256-entry byte -> contribution table per position (no loop, no slicing)
+def _build_luhn15():
+    env = {}
+    for i in range(15):
+        row = [0] * 256
+        for d, v in enumerate(_DOUBLED if i % 2 else range(10)):
+            row[48 + d] = v
+        env["_T%d" % i] = tuple(row)
+    src = "def _luhn15(b):\n    return (%s) %% 10\n" % " + ".join("_T%d[b[%d]]" % (i, i) for i in range(15))
+    exec(src, env)
+    return env["_luhn15"]
+
+_luhn15 = _build_luhn15()
+
+def _luhn_ascii(b):
+    """Luhn checksum modulo 10 of an ASCII digit string"""
+    if len(b) == 15:
+        return _luhn15(b)
+    # counting from the right, even offsets are plain and odd ones doubled
+    return (sum(b[-1::-2].translate(_PLAIN_TABLE)) + sum(b[-2::-2].translate(_DOUBLE_TABLE))) % 10
+
 def luhn_checksum_mod10(s):
     """Calculate Luhn checksum modulo 10"""
     if not s.isdigit():
         raise ValueError("non-digit in Luhn input")
+    b = s.encode()
+    if len(b) == len(s):  # ASCII only; other Unicode digits take the loop
+        return _luhn_ascii(b)
     total = 0
     for i, ch in enumerate(s[::-1]):
         d = ord(ch) - 48
@@ -94,27 +144,107 @@ def calc_check_digit14(first14):
     """Calculate check digit for 14-digit IMEI base"""
     if not (isinstance(first14, str) and first14.isdigit() and len(first14) == 14):
         raise ValueError("first14 must be 14 digits")
-    mod = luhn_checksum_mod10(first14 + "0")
-    return str((10 - mod) % 10)
+    b = first14.encode()
+    if len(b) != 14:
+        return str((10 - luhn_checksum_mod10(first14 + "0")) % 10)
+    # the check digit takes offset 0, so parities are swapped
+    return _CHECK_DIGIT[(sum(b[-1::-2].translate(_DOUBLE_TABLE)) + sum(b[-2::-2].translate(_PLAIN_TABLE))) % 10]
+
+_ASCII_DIGITS = b"0123456789"
 
 def is_valid_imei(i):
     """Validate IMEI using Luhn algorithm"""
-    return isinstance(i, str) and len(i) == 15 and i.isdigit() and luhn_checksum_mod10(i) == 0
+    if not (isinstance(i, str) and i.isascii()):
+        return False
+    b = i.encode()
+    # deleting every digit must leave nothing behind
+    return len(b) == 15 and not b.translate(None, _ASCII_DIGITS) and _luhn_ascii(b) == 0
+
+def _luhn_mods(imeis):
+    """Luhn checksum of each IMEI, None where it is not 15 ASCII digits"""
+    # the joined blob is only trusted once every item is known to be 15 long
+    if all(len(im) == 15 for im in imeis):
+        blob = "".join(imeis)
+        if blob.isascii():
+            blob = blob.encode()
+            if not blob.translate(None, _ASCII_DIGITS):
+                return [_luhn15(blob[k:k + 15]) for k in range(0, len(blob), 15)]
+    mods = []
+    for im in imeis:
+        ok = len(im) == 15 and im.isascii()
+        b = im.encode() if ok else b""
+        mods.append(_luhn15(b) if ok and not b.translate(None, _ASCII_DIGITS) else None)
+    return mods
+
+def _partial_luhn(tac):
+    """Luhn sum of an 8-digit TAC at its place in a 15-digit IMEI"""
+    return sum(_DOUBLED[int(d)] if i % 2 else int(d) for i, d in enumerate(tac))
+
+# Serial contributions by 3-digit half: digits 9-11 and 12-14 of the IMEI
+_SERIAL_HI = tuple(a + _DOUBLED[b] + c for a in range(10) for b in range(10) for c in range(10))
+_SERIAL_LO = tuple(_DOUBLED[a] + b + _DOUBLED[c] for a in range(10) for b in range(10) for c in range(10))
+
+# Zero-padded 3-digit strings
+_DIGITS3 = tuple(f"{i:03d}" for i in range(1000))
+
+_TAC_LUHN = {tac: _partial_luhn(tac) for tac, _ in TACS}
+
+def _tac_luhn(tac):
+    """Return the TAC's Luhn contribution, precomputed for database TACs"""
+    partial = _TAC_LUHN.get(tac)
+    if partial is None:
+        if not (isinstance(tac, str) and tac.isdigit() and len(tac) == 8):
+            raise ValueError("tac must be 8 digits")
+        partial = _partial_luhn(tac)
+    return partial
 
 # ----- IMEI Generation Functions -----
+# getrandbits() is a single Mersenne Twister extract; drawing enough bits
+# and rejecting out-of-range values skips randrange()'s argument handling
+# while staying uniform (20 bits reject ~5%, 27 bits ~33%)
+def _rand_serial(rng):
+    """Uniform integer in 0..999999"""
+    n = rng.getrandbits(20)
+    while n >= 1000000:
+        n = rng.getrandbits(20)
+    return n
+
+def _rand_tac(rng):
+    """Uniform integer in 10000000..99999999"""
+    n = rng.getrandbits(27)
+    while n >= 90000000:
+        n = rng.getrandbits(27)
+    return n + 10000000
+
 def gen_serial6(rng):
     """Generate 6-digit serial number"""
-    return f"{rng.randrange(0, 10**6):06d}"
+    hi, lo = divmod(_rand_serial(rng), 1000)
+    return _DIGITS3[hi] + _DIGITS3[lo]
 
 def gen_imei_for_tac(tac, rng):
     """Generate IMEI for given TAC"""
-    s6 = gen_serial6(rng)
-    first14 = tac + s6
-    return first14 + calc_check_digit14(first14)
+    partial = _tac_luhn(tac)
+    hi, lo = divmod(_rand_serial(rng), 1000)
+    return tac + _DIGITS3[hi] + _DIGITS3[lo] + _CHECK_DIGIT[(partial + _SERIAL_HI[hi] + _SERIAL_LO[lo]) % 10]
+
+def gen_serials6(rng, count):
+    """Draw count 6-digit serial numbers in one pass"""
+    serials = []
+    while len(serials) < count:
+        draws = map(rng.getrandbits, repeat(20, count - len(serials)))
+        serials += [n for n in draws if n < 1000000]
+    return serials
+
+def gen_imeis_for_tac(tac, rng, count):
+    """Generate a batch of IMEIs for given TAC"""
+    partial = _tac_luhn(tac)
+    return [tac + _DIGITS3[hi] + _DIGITS3[lo] + _CHECK_DIGIT[(partial + _SERIAL_HI[hi] + _SERIAL_LO[lo]) % 10]
+            for hi, lo in map(divmod, gen_serials6(rng, count), repeat(1000))]
 
 def gen_random_tac(rng):
     """Generate random 8-digit TAC"""
-    return f"{rng.randrange(10**7, 10**8):08d}"
+    hi, lo = divmod(_rand_tac(rng), 10**6)
+    return str(hi) + _DIGITS3[lo // 1000] + _DIGITS3[lo % 1000]
 
 def gen_completely_random_imei(rng):
     """Generate completely random IMEI with random TAC"""
@@ -122,18 +252,31 @@ def gen_completely_random_imei(rng):
     return gen_imei_for_tac(tac, rng)
 
 # ----- AT Command Formatting -----
+# Constant halves of the AT commands around the IMEI
+_MIKROTIK_PREFIX = f'interface lte at-chat {LTE_INTERFACE} input="AT+EGMR=1,7,\\"'
+_MIKROTIK_SUFFIX = '\\""'
+_FIBERHOME_PREFIX = 'AT+EGMR=1,7,"'
+_FIBERHOME_SUFFIX = '"'
+
 def at_command_for_imei(imei, interface=LTE_INTERFACE):
     """Format IMEI for MikroTik AT command"""
+    if interface == LTE_INTERFACE:
+        return _MIKROTIK_PREFIX + imei + _MIKROTIK_SUFFIX
     return f'interface lte at-chat {interface} input="AT+EGMR=1,7,\\"{imei}\\""'
 
 def fiberhome_at_command_for_imei(imei):
     """Format IMEI for FiberHome AT command"""
-    return f'AT+EGMR=1,7,"{imei}"'
+    return _FIBERHOME_PREFIX + imei + _FIBERHOME_SUFFIX
 
 # ----- Utility Functions -----
 def clear_screen():
     """Clear terminal screen"""
-    os.system("cls" if os.name == "nt" else "clear")
+    if sys.stdout.isatty() and os.environ.get("TERM") != "dumb":
+        # ANSI erase + cursor home; no subprocess per redraw
+        sys.stdout.write("\x1b[2J\x1b[H")
+        sys.stdout.flush()
+    else:
+        os.system("cls" if os.name == "nt" else "clear")
 
 def pause(msg="Press Enter to continue..."):
     """Pause execution until user presses Enter"""
@@ -150,12 +293,20 @@ def save_at_block(device_name, tac, imeis):
     """Save AT commands to file"""
     safe = safe_filename(device_name)
     fname = f"at_{safe}.txt"
-    with open(fname, "w", encoding="utf-8") as f:
-        f.write(f"# AT commands for {device_name} (TAC {tac})\n")
-        f.write(f"# Generated: {datetime.utcnow().isoformat()}Z\n\n")
-        for im in imeis:
-            f.write(at_command_for_imei(im) + "\n")
-        f.write("\n/system reboot\n")
+    line_end = _MIKROTIK_SUFFIX + "\n"
+    generated = datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+    text = "".join((
+        f"# AT commands for {device_name} (TAC {tac})\n",
+        f"# Generated: {generated}Z\n\n",
+        "".join(_MIKROTIK_PREFIX + im + line_end for im in imeis),
+        "\n/system reboot\n",
+    ))
+    # encode once and hand the bytes to the OS in one write, skipping the
+    # text layer; newlines are translated the way text mode would
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    with open(fname, "wb") as f:
+        f.write(text.encode("utf-8"))
     return fname
 
 # ----- IMEI Generation Functions -----
@@ -180,21 +331,24 @@ def generate_custom_tac_imeis(rng, count=10):
             print(color("\nOperation cancelled.", DIM))
             return None
     
-    imeis = [gen_imei_for_tac(tac_input, rng) for _ in range(count)]
+    imeis = gen_imeis_for_tac(tac_input, rng, count)
     return {"tac": tac_input, "name": f"Custom TAC: {tac_input}", "imeis": imeis}
 
 # ----- Device View Function -----
 def device_view(g, count, rng):
     """Display device details and handle commands"""
+    # Luhn status per IMEI, computed once per list rather than per redraw
+    valid = [mod == 0 for mod in _luhn_mods(g["imeis"])]
     while True:
         clear_screen()
-        print(color(f"Device: {g['name']}  (TAC {g['tac']})", BOLD + CYAN))
-        print(color("-" * 44, DIM))
-        for i, im in enumerate(g["imeis"], 1):
-            print(f"{i:2d}. {color(im, GREEN if is_valid_imei(im) else RED)}")
-        print()
-        print(color("Commands: a=mikrotik  f=fiberhome  s=save  v=validate  r=regenerate  b=back  q=quit", DIM))
-        cmd = input(color("Enter command: ", YELLOW)).strip().lower()
+        lines = [
+            color(f"Device: {g['name']}  (TAC {g['tac']})", BOLD + CYAN),
+            color("-" * 44, DIM),
+        ]
+        lines += [f"{i:2d}. {color(im, GREEN if ok else RED)}" for i, (im, ok) in enumerate(zip(g["imeis"], valid), 1)]
+        lines += ["", color("Commands: a=mikrotik  f=fiberhome  s=save  v=validate  r=regenerate  b=back  q=quit", DIM)]
+        sys.stdout.write("\n".join(lines) + "\n")
+        cmd = input(_PROMPT_CMD).strip().lower()
         
         if cmd in ("b", "0", "back"):
             return False
@@ -230,10 +384,10 @@ def device_view(g, count, rng):
         if cmd in ("v", "validate"):
             print()
             print(color(f"{'IMEI':16s} {'CHK':^4s} {'MOD':^4s} {'STATUS':>6s}", BOLD + CYAN))
-            for imei in g["imeis"]:
+            for imei, mod in zip(g["imeis"], _luhn_mods(g["imeis"])):
                 chk = imei[-1]
-                mod = str(luhn_checksum_mod10(imei))
-                ok = "VALID" if is_valid_imei(imei) else "INVALID"
+                ok = "VALID" if mod == 0 else "INVALID"
+                mod = str(luhn_checksum_mod10(imei) if mod is None else mod)
                 stat_col = GREEN if ok == "VALID" else RED
                 print(f"{imei:16s} {chk:^4s} {mod:^4s} {color(ok, stat_col):>6s}")
             pause()
@@ -254,7 +408,8 @@ def device_view(g, count, rng):
             if g["tac"] == "Various":
                 g["imeis"] = [gen_completely_random_imei(rng) for _ in range(count)]
             else:
-                g["imeis"] = [gen_imei_for_tac(g["tac"], rng) for _ in range(count)]
+                g["imeis"] = gen_imeis_for_tac(g["tac"], rng, count)
+            valid = [True] * count  # generated IMEIs are valid by construction
                 
             print(color(f"Regenerated {count} IMEIs for this device.", GREEN))
             pause()
@@ -284,37 +439,46 @@ def check_user_imei():
 # ----- Main Application -----
 def main(count=DEFAULT_COUNT, seed=None, no_color=False):
     """Main application function"""
-    global USE_COLOR
+    global USE_COLOR, color, _PROMPT_CMD, _PROMPT_CHOICE
     if no_color:
         USE_COLOR = False
+        color = _plain
+        _PROMPT_CMD = "Enter command: "
+        _PROMPT_CHOICE = "Enter choice: "
+    if os.name == "nt":
+        os.system("")  # enables ANSI escape processing in the Windows console
 
     rng = random.Random(seed) if seed is not None else random.Random(secrets.randbits(64))
 
-    # Pre-generate IMEIs for all devices
-    groups = []
-    for tac, name in TACS:
-        imeis = [gen_imei_for_tac(tac, rng) for _ in range(count)]
-        groups.append({"tac": tac, "name": name, "imeis": imeis})
+    # Pre-generate IMEIs for all devices, stored column-wise:
+    # device_imeis[i] is the list of IMEIs for device i
+    tacs = [tac for tac, _ in TACS]
+    names = [name for _, name in TACS]
+    device_imeis = [gen_imeis_for_tac(tac, rng, count) for tac in tacs]
+
+    # The main menu never changes while running; color it once
+    menu_lines = [
+        color("IMEI Atlas", BOLD + CYAN),
+        color("=" * 44, DIM),
+        color(f"Author: {AUTHOR_NAME}", DIM),
+        color(f"Devices: {len(names)} | IMEIs per device: {count}", DIM),
+    ]
+    # Device list
+    menu_lines += [color(f"{i:2d}. {name}", CYAN) for i, name in enumerate(names, start=1)]
+    # Special options
+    menu_lines += [
+        color(f"{len(names)+1:2d}. Generate random IMEIs (different TACs)", CYAN),
+        color(f"{len(names)+2:2d}. Generate IMEIs with custom TAC", CYAN),
+        color("43. Check your IMEI (Luhn)", CYAN),
+        "",
+        color("Select a device number to view (q to quit).", DIM),
+    ]
+    menu_text = "\n".join(menu_lines)
 
     while True:
         clear_screen()
-        print(color("IMEI Atlas", BOLD + CYAN))
-        print(color("=" * 44, DIM))
-        print(color(f"Author: {AUTHOR_NAME}", DIM))
-        print(color(f"Devices: {len(groups)} | IMEIs per device: {count}", DIM))
-        
-        # Display device list
-        for i, g in enumerate(groups, start=1):
-            print(color(f"{i:2d}. {g['name']}", CYAN))
-        
-        # Display special options
-        print(color(f"{len(groups)+1:2d}. Generate random IMEIs (different TACs)", CYAN))
-        print(color(f"{len(groups)+2:2d}. Generate IMEIs with custom TAC", CYAN))
-        print(color("43. Check your IMEI (Luhn)", CYAN))
-        
-        print()
-        print(color("Select a device number to view (q to quit).", DIM))
-        choice = input(color("Enter choice: ", YELLOW)).strip().lower()
+        print(menu_text)
+        choice = input(_PROMPT_CHOICE).strip().lower()
         
         # Handle special option 43
         if choice == "43":
@@ -333,7 +497,7 @@ def main(count=DEFAULT_COUNT, seed=None, no_color=False):
         idx = int(choice) - 1
 
         # Handle special options
-        if idx == len(groups):  # Random IMEIs
+        if idx == len(names):  # Random IMEIs
             try:
                 random_count_input = input(color("Enter number of random IMEIs to generate (default 10): ", YELLOW)).strip()
                 random_count = 10 if not random_count_input else int(random_count_input)
@@ -351,7 +515,7 @@ def main(count=DEFAULT_COUNT, seed=None, no_color=False):
                     return
             continue
             
-        if idx == len(groups) + 1:  # Custom TAC
+        if idx == len(names) + 1:  # Custom TAC
             temp_group = generate_custom_tac_imeis(rng, 10)
             if temp_group:
                 should_quit = device_view(temp_group, 10, rng)
@@ -360,13 +524,15 @@ def main(count=DEFAULT_COUNT, seed=None, no_color=False):
             continue
         
         # Handle regular device selection
-        if idx < 0 or idx >= len(groups):
+        if idx < 0 or idx >= len(names):
             print(color("Invalid selection.", RED))
             pause()
             continue
 
         # Regular device view
-        should_quit = device_view(groups[idx], count, rng)
+        g = {"tac": tacs[idx], "name": names[idx], "imeis": device_imeis[idx]}
+        should_quit = device_view(g, count, rng)
+        device_imeis[idx] = g["imeis"]  # keep a regenerated list
         if should_quit:
             return
 